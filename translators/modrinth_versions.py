@@ -12,7 +12,7 @@ Usage:
         KbH00yy8
         tAx0UOBX
         AABBCCDD
-    2. Install required packages: `pip install requests`
+    2. Install required packages: `pip install aiohttp` (or `pip install requests` as a fallback)
     3. Run the script: `python3 modrinth_versions.py`
     4. The script will generate a sync file (default: sync.json) with all the necessary information
 """
@@ -27,16 +27,56 @@ input_file = "versions.txt"
 # Output JSON file that will contain the sync information
 output_file = "sync.json"
 
+# Sidecar cache of API responses plus their ETag/Last-Modified validators;
+# lets repeat runs turn unchanged requests into empty 304 round-trips
+http_cache_file = output_file + ".http_cache"
+
+# Number of IDs sent per API request; Modrinth rejects or truncates overly long query strings
+api_batch_size = 100
+
 ### CODE
+import asyncio
 import enum
 import json
-import requests
+from dataclasses import dataclass
 from typing import List, Dict
+from urllib.parse import quote
+
+try:
+    import aiohttp
+except ImportError:
+    # Fall back to synchronous requests with connection pooling and retries
+    aiohttp = None
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+# Sent with every API request so Modrinth can identify the client
+user_agent = "simple-mod-sync/1.0"
+
+try:
+    # orjson parses and serializes JSON several times faster than the stdlib
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
 
 # Enum to categorize different types of Minecraft content
 ContentType = enum.Enum('ContentType', ['mod', 'resourcepack', 'datapack', 'shader'])
 
+# Loader families used to classify a version's content type
+_MOD_LOADERS = frozenset({"fabric", "quilt", "forge", "neoforge"})
+_SHADER_LOADERS = frozenset({"iris", "optifine"})
 
+
+@dataclass(slots=True)
 class Content:
     """
     Represents a single piece of Minecraft content (mod, resourcepack, etc.) to be synced.
@@ -52,16 +92,10 @@ class Content:
     version: str
     type: ContentType
 
-    def __init__(self, url: str, name: str, version: str, type: ContentType):
-        self.url = url
-        self.name = name
-        self.version = version
-        self.type = type
-
     def __str__(self):
         return f"Content(url={self.url}, name={self.name}, version={self.version}, type={self.type})"
 
-    def __dict__(self):
+    def to_dict(self):
         """Convert the content object to a dictionary for JSON serialization"""
         return {
             "url": self.url,
@@ -96,10 +130,22 @@ class SyncData:
 
     def to_json(self):
         """Convert the sync data to a JSON string for saving to file"""
-        return json.dumps({
+        return _json_dumps({
             "sync_version": self.version,
-            "sync": [content.__dict__() for content in self.contents]
-        })
+            "sync": [content.to_dict() for content in self.contents]
+        }).decode()
+
+    def dump(self, fp):
+        """
+        Stream the sync data as JSON into a binary file object, writing one
+        content entry at a time so the full document is never held in memory.
+        """
+        fp.write(b'{"sync_version":' + str(self.version).encode() + b',"sync":[')
+        for index, content in enumerate(self.contents):
+            if index:
+                fp.write(b",")
+            fp.write(_json_dumps(content.to_dict()))
+        fp.write(b"]}")
 
 
 class Parser:
@@ -111,22 +157,34 @@ class Parser:
     """
     path: str
     versions: List[str]  # List of version IDs from input file
-    id_map: Dict[str, str] = {}  # Maps version IDs to project IDs
+    id_map: Dict[str, str]  # Maps version IDs to project IDs
 
     def __init__(self, path: str):
         self.path = path
         self.__read_file()
-        self.__init_id_map()
+        # Per-instance and presized; a class-level {} default would be shared
+        # across all Parser instances
+        self.id_map = dict.fromkeys(self.versions, "")
+        self.http_cache = self.__load_http_cache()
 
-    def parse(self) -> SyncData:
+    async def parse(self) -> SyncData:
         """
         Main parsing function that coordinates the API calls and data processing.
         Returns a SyncData object containing all content information.
         """
-        # Get file information for all versions
-        files_info = self.__get_versions_files()
-        # Get project names for all versions
-        projects_info = self.__get_projects_info()
+        if aiohttp is not None:
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=16),
+                                             headers={"User-Agent": user_agent}) as session:
+                # Get file information for all versions
+                files_info = await self.__get_versions_files(session)
+                # Get project names for all versions (needs the id_map filled by the call above)
+                projects_info = await self.__get_projects_info(session)
+        else:
+            with self.__build_sync_session() as session:
+                files_info = await self.__get_versions_files(session)
+                projects_info = await self.__get_projects_info(session)
+
+        self.__save_http_cache()
 
         # Create Content objects for each version
         contents = []
@@ -140,29 +198,114 @@ class Parser:
         return SyncData(contents)
 
     def __read_file(self):
-        """Read version IDs from the input file"""
+        """
+        Stream version IDs from the input file one line at a time, skipping
+        blank lines and dropping duplicates while keeping order.
+        """
         with open(self.path, "r") as f:
-            data = f.read()
-            self.versions = data.splitlines()
+            self.versions = list(dict.fromkeys(line.strip() for line in f if line.strip()))
 
-    def __init_id_map(self):
-        """Initialize the version ID to project ID mapping dictionary"""
-        for version in self.versions:
-            self.id_map[version] = ""
+    @staticmethod
+    def __build_sync_session() -> "requests.Session":
+        """
+        Build a pooled requests.Session so repeated calls reuse TLS connections
+        instead of paying a full handshake per request. Used when aiohttp is unavailable.
+        """
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        ))
+        session.headers["User-Agent"] = user_agent
+        return session
+
+    @staticmethod
+    def __load_http_cache() -> Dict[str, dict]:
+        """
+        Load the conditional-GET cache mapping URL -> {etag, last_modified, body}.
+        A missing or unreadable cache simply means every request is fetched fresh.
+        """
+        try:
+            with open(http_cache_file, "rb") as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def __save_http_cache(self):
+        """Persist the conditional-GET cache next to the output file"""
+        with open(http_cache_file, "wb") as f:
+            f.write(_json_dumps(self.http_cache))
+
+    def __store_response(self, url: str, headers, body: bytes):
+        """Remember the response and its validators for future conditional requests"""
+        etag = headers.get("ETag", "")
+        last_modified = headers.get("Last-Modified", "")
+        if etag or last_modified:
+            self.http_cache[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": body.decode()
+            }
+
+    async def __fetch_json(self, session, url: str):
+        """
+        Perform a single GET request and return the decoded JSON body.
 
-    def __get_versions_files(self) -> Dict[str, any]:
+        Sends If-None-Match/If-Modified-Since validators from the cache when
+        available; a 304 answer reuses the cached body without re-downloading.
+        Returns None (and prints the error) on any other non-200 response.
         """
-        Query the Modrinth API for version information.
+        cached = self.http_cache.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        if aiohttp is not None:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    return _json_loads(cached["body"])
+                if response.status == 200:
+                    body = await response.read()
+                    self.__store_response(url, response.headers, body)
+                    return _json_loads(body)
+                print(f"Failed to fetch {url}: {response.status}, {await response.text()}")
+                return None
+
+        response = session.get(url, timeout=10, headers=headers)
+        if response.status_code == 304 and cached:
+            return _json_loads(cached["body"])
+        if response.status_code == 200:
+            self.__store_response(url, response.headers, response.content)
+            return _json_loads(response.content)
+        print(f"Failed to fetch {url}: {response.status_code}, {response.text}")
+        return None
+
+    @staticmethod
+    def __batch_urls(endpoint: str, ids: List[str]) -> List[str]:
+        """Build one API URL per batch of IDs so no single query string gets too long"""
+        urls = []
+        for i in range(0, len(ids), api_batch_size):
+            # IDs are known-safe alphanumerics, so the JSON array can be joined by hand
+            batch = quote('["' + '","'.join(ids[i:i + api_batch_size]) + '"]')
+            urls.append(f"{modrinth_api_base_url}{endpoint}?ids={batch}")
+        return urls
+
+    async def __get_versions_files(self, session) -> Dict[str, any]:
+        """
+        Query the Modrinth API for version information, one parallel request per batch.
         Returns a dictionary mapping version IDs to file URLs and content types.
         """
-        ids = json.dumps(self.versions)
-        url = f"{modrinth_api_base_url}versions?ids={ids}"
-
-        response = requests.get(url)
+        urls = self.__batch_urls("versions", self.versions)
+        responses = await asyncio.gather(*[self.__fetch_json(session, url) for url in urls])
         files = {}
 
-        if response.status_code == 200:
-            versions_info = response.json()
+        for versions_info in responses:
+            if versions_info is None:
+                continue
 
             for version in versions_info:
                 version_id = version.get('id')
@@ -179,8 +322,6 @@ class Parser:
                     "url": file_url,
                     "type": self.__get_project_type(version.get('loaders', []))
                 }
-        else:
-            print(f"Failed to fetch versions info: {response.status_code}, {response.text}")
 
         return files
 
@@ -189,41 +330,39 @@ class Parser:
         Determine the content type based on the loader information from Modrinth.
         Returns a ContentType enum value.
         """
-        for loader in loaders:
-            if loader in ["fabric", "quilt", "forge", "neoforge"]:
-                return ContentType.mod
-            elif loader in ["iris", "optifine"]:
-                return ContentType.shader
-            elif loader == "datapack":
-                return ContentType.datapack
-            elif loader == "minecraft":
-                return ContentType.resourcepack
+        found = set(loaders)
+        if found & _MOD_LOADERS:
+            return ContentType.mod
+        if found & _SHADER_LOADERS:
+            return ContentType.shader
+        if "datapack" in found:
+            return ContentType.datapack
+        if "minecraft" in found:
+            return ContentType.resourcepack
 
         # Default to mod if no specific loader is identified
         return ContentType.mod
 
-    def __get_projects_info(self) -> Dict[str, str]:
+    async def __get_projects_info(self, session) -> Dict[str, str]:
         """
-        Query the Modrinth API for project information.
+        Query the Modrinth API for project information, one parallel request per batch.
         Returns a dictionary mapping project IDs to project names.
         """
-        project_ids = [id for id in self.id_map.values() if id]
-        ids = json.dumps(project_ids)
-        url = f"{modrinth_api_base_url}projects?ids={ids}"
-
-        response = requests.get(url)
+        # Several versions can belong to the same project; only ask for each once
+        project_ids = list({id for id in self.id_map.values() if id})
+        urls = self.__batch_urls("projects", project_ids)
+        responses = await asyncio.gather(*[self.__fetch_json(session, url) for url in urls])
         projects_info = {}
 
-        if response.status_code == 200:
-            projects = response.json()
+        for projects in responses:
+            if projects is None:
+                continue
 
             for project in projects:
                 project_id = project.get('id')
                 # Use title if available, fall back to slug if not
                 project_name = project.get('title', project.get('slug', 'UNKNOWN'))
                 projects_info[project_id] = project_name
-        else:
-            print(f"Failed to fetch projects info: {response.status_code}, {response.text}")
 
         return projects_info
 
@@ -237,9 +376,9 @@ def main():
     parser = Parser(input_file)
     print("Generating sync file", output_file)
     try:
-        sync_data = parser.parse()
-        with open(output_file, "w") as f:
-            f.write(sync_data.to_json())
+        sync_data = asyncio.run(parser.parse())
+        with open(output_file, "wb") as f:
+            sync_data.dump(f)
     except Exception as e:
         print("Failed to generate sync file:", e)
     print("Done")
@@ -45,6 +45,10 @@ output_file = "./sync.json"
 # If the program should try to parse files containing only MANIFEST.MF
 accept_mfs = False
 
+# Sidecar cache written next to the output file; lets repeated runs skip
+# re-parsing archives whose size and mtime have not changed
+cache_file = output_file + ".cache"
+
 
 
 ### CODE
@@ -52,16 +56,39 @@ accept_mfs = False
 
 
 import os
+import random
 import zipfile
 import json
 import enum
 import tomllib as toml
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import PurePosixPath
 from typing import List
 
+try:
+    # orjson serializes JSON several times faster than the stdlib
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
 
 ContentType = enum.Enum('ContentType', ['mod', 'resourcepack', 'datapack', 'shader'])
 
+# Placeholder versions only need to be unique, not cryptographically strong,
+# so a userspace PRNG avoids a getrandom syscall per file
+_RNG = random.Random()
+
 
+@dataclass(slots=True)
 class Content:
     """
     Represents a piece of content to be synced.
@@ -77,16 +104,10 @@ class Content:
     version: str
     type: ContentType
 
-    def __init__(self, url: str, name: str, version: str, type: ContentType):
-        self.url = url
-        self.name = name
-        self.version = version
-        self.type = type
-
     def __str__(self):
         return f"Content(url={self.url}, name={self.name}, version={self.version}, type={self.type})"
 
-    def __dict__(self):
+    def to_dict(self):
         return {
             "url": self.url,
             "name": self.name,
@@ -94,6 +115,10 @@ class Content:
             "type": self.type.name
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Content":
+        return cls(data["url"], data["name"], data["version"], ContentType[data["type"]])
+
 
 class SyncData:
     """
@@ -118,10 +143,22 @@ class SyncData:
         self.contents.append(content)
 
     def to_json(self):
-        return json.dumps({
+        return _json_dumps({
             "sync_version": self.version,
-            "sync": [content.__dict__() for content in self.contents]
-        })
+            "sync": [content.to_dict() for content in self.contents]
+        }).decode()
+
+    def dump(self, fp):
+        """
+        Stream the sync data as JSON into a binary file object, one content
+        entry at a time, instead of materializing the whole document first.
+        """
+        fp.write(b'{"sync_version":' + str(self.version).encode() + b',"sync":[')
+        for index, content in enumerate(self.contents):
+            if index:
+                fp.write(b",")
+            fp.write(_json_dumps(content.to_dict()))
+        fp.write(b"]}")
 
 
 class Parser:
@@ -138,10 +175,6 @@ class Parser:
     accept_mf: bool
 
     def __init__(self, file_path: str, correction: str, accept_mf: bool = False):
-        # Check if the file exists
-        if not os.path.exists(file_path):
-            raise Exception(f"{file_path} does not exist")
-
         # Check if the file is a .jar or .zip
         if not file_path.endswith(".jar") and not file_path.endswith(".zip"):
             raise Exception(f"{file_path} is not a .jar or .zip file")
@@ -159,7 +192,9 @@ class Parser:
         :return: A Content object containing the parsed data.
         :raises Exception: If the manifest file type is unknown or if any parsing errors occur.
         """
-        with zipfile.ZipFile(self.file, "r") as archive:
+        # A large read buffer keeps the central-directory scan and manifest
+        # reads to a handful of syscalls per archive
+        with open(self.file, "rb", buffering=1 << 20) as fp, zipfile.ZipFile(fp) as archive:
             return self.__parse_manifest(archive)
 
     def __get_manifest(self, archive: zipfile.ZipFile) -> str:
@@ -190,12 +225,16 @@ class Parser:
             "data/", # DEV: Might not trigger sometimes
             "pack.mcmeta"
         ]
+        # One membership set instead of repeated getinfo calls, which raise
+        # (and catch) a KeyError for every path that is missing
+        names = set(archive.namelist())
         for path in paths_to_try:
-            try:
-                archive.getinfo(path)
+            if path.endswith("/"):
+                # Directory probe: also matches archives without an explicit directory entry
+                if any(name.startswith(path) for name in names):
+                    return path
+            elif path in names:
                 return path
-            except:
-                pass
 
         # Check if the program should try to parse files containing only MANIFEST.MF
         if not self.accept_mf:
@@ -207,11 +246,8 @@ class Parser:
             "META-INF/MANIFEST.MF"
         ]
         for mf in manifests:
-            try:
-                archive.getinfo(mf)
+            if mf in names:
                 return mf
-            except:
-                pass
 
         raise Exception("Absolutely no manifest found for the file " + archive.filename + ".")
 
@@ -219,91 +255,73 @@ class Parser:
         """
             Parses the manifest file from the given archive and returns a Content object.
 
-            This method identifies the manifest file path using the __get_manifest method.
-            It supports various types of content such as shaders, data packs, mods, and
-            resource packs. The method parses the manifest file based on its type and
-            extracts necessary information to construct a Content object.
+            This method identifies the manifest file path using the __get_manifest method
+            and dispatches to the handler registered for its suffix (or directory
+            sentinel) in _MANIFEST_HANDLERS. It supports various types of content
+            such as shaders, data packs, mods, and resource packs.
 
             :param archive: The archive from which to parse the manifest.
             :return: Content object representing the parsed content.
             :raises Exception: If the manifest file type is unknown or if any parsing errors occur.
         """
-        content: Content
-        try:
-            path = self.__get_manifest(archive)
-            if not path.endswith("/"):
-                data_stream = archive.open(path, "r")
-            else:
-                match (path):
-
-                    # Shaders
-                    case "shaders/":
-                        uri = self.__get_uri(archive.filename, self.correction)
-                        name = self.__get_name_from_path(archive.filename)
-                        version = self.__get_rand_version()
-                        content = Content(uri, name, version, ContentType.shader)
-
-                    # Data packs
-                    case "data/":
-                        uri = self.__get_uri(archive.filename, self.correction)
-                        name = self.__get_name_from_path(archive.filename)
-                        version = self.__get_rand_version()
-                        content = Content(uri, name, version, ContentType.datapack)
-
-                    case _:
-                        raise Exception(f"Unknown path: {path}")
-                return content
-        except Exception:
-            raise
-
-        # Quilt, Fabric
-        if path.endswith(".json"):
-            manifest = json.load(data_stream)
-            name = manifest["name"]
-            version = manifest["version"]
-            uri = self.__get_uri(archive.filename, self.correction)
-            content = Content(uri, name, version, ContentType.mod)
-            return content
-
-        # NeoForge, Forge
-        elif path.endswith(".toml"):
-            manifest = toml.load(data_stream)['mods'][0]
-            name = manifest["displayName"] if "displayName" in manifest else manifest["modId"]
-            version = manifest["version"]
-            uri = self.__get_uri(archive.filename, self.correction)
-            content = Content(uri, name, version, ContentType.mod)
-
-        # Resource packs
-        elif path.endswith(".mcmeta"):
-            uri = self.__get_uri(archive.filename, self.correction)
-            name = self.__get_name_from_path(archive.filename)
-            version = self.__get_rand_version()
-            content = Content(uri, name, version, ContentType.resourcepack)
-
-        # .MF files (most likely mods)
-        elif path.endswith(".MF"):
-            uri = self.__get_uri(archive.filename, self.correction)
-            name = self.__get_name_from_path(archive.filename)
-            version = self.__get_rand_version()
-            content = Content(uri, name, version, ContentType.mod)
-        else:
+        path = self.__get_manifest(archive)
+        suffix = path if path.endswith("/") else os.path.splitext(path)[1]
+        handler = self._MANIFEST_HANDLERS.get(suffix)
+        if handler is None:
             raise Exception(f"Unknown path: {path}")
-
-        data_stream.close()
-
-        return content
+        return handler(self, archive, path)
+
+    def __content_from_filename(self, archive: zipfile.ZipFile, type: ContentType) -> Content:
+        """Build a Content named after the archive itself, with a random version"""
+        uri = self.__get_uri(archive.filename, self.correction)
+        name = self.__get_name_from_path(archive.filename)
+        version = self.__get_rand_version()
+        return Content(uri, name, version, type)
+
+    # Quilt, Fabric
+    def __parse_mod_json(self, archive: zipfile.ZipFile, path: str) -> Content:
+        # Manifests are tiny; one read-and-decompress beats streaming chunks
+        manifest = _json_loads(archive.read(path))
+        uri = self.__get_uri(archive.filename, self.correction)
+        return Content(uri, manifest["name"], manifest["version"], ContentType.mod)
+
+    # NeoForge, Forge
+    def __parse_mods_toml(self, archive: zipfile.ZipFile, path: str) -> Content:
+        manifest = toml.loads(archive.read(path).decode("utf-8"))['mods'][0]
+        name = manifest["displayName"] if "displayName" in manifest else manifest["modId"]
+        uri = self.__get_uri(archive.filename, self.correction)
+        return Content(uri, name, manifest["version"], ContentType.mod)
+
+    # Resource packs
+    def __parse_mcmeta(self, archive: zipfile.ZipFile, path: str) -> Content:
+        return self.__content_from_filename(archive, ContentType.resourcepack)
+
+    # .MF files (most likely mods)
+    def __parse_mf(self, archive: zipfile.ZipFile, path: str) -> Content:
+        return self.__content_from_filename(archive, ContentType.mod)
+
+    # Shaders
+    def __parse_shader_dir(self, archive: zipfile.ZipFile, path: str) -> Content:
+        return self.__content_from_filename(archive, ContentType.shader)
+
+    # Data packs
+    def __parse_datapack_dir(self, archive: zipfile.ZipFile, path: str) -> Content:
+        return self.__content_from_filename(archive, ContentType.datapack)
+
+    # Dispatch table keyed by manifest suffix or directory sentinel
+    _MANIFEST_HANDLERS = {
+        ".json": __parse_mod_json,
+        ".toml": __parse_mods_toml,
+        ".mcmeta": __parse_mcmeta,
+        ".MF": __parse_mf,
+        "shaders/": __parse_shader_dir,
+        "data/": __parse_datapack_dir,
+    }
 
     @staticmethod
     def __get_uri(filename: str, correction: str) -> str:
-        # Get the relative path of the file
-        last_slash_index = filename.rfind("/")
-        if last_slash_index != -1:
-            relative_path = filename[last_slash_index+1:]
-            # If the file is in a subdirectory, remove the subdirectory from the path
-            if relative_path.startswith("/"):
-                relative_path = relative_path[1:]
-        else:
-            relative_path = filename
+        # Get the file name without its directories
+        relative_path = PurePosixPath(filename).name
 
         # Add the correction to the path if it's not empty
         if len(correction) != 0:
@@ -325,15 +343,27 @@ class Parser:
             :param path: The path to the file
             :return: The name of the file
         """
-        return "".join((path.split("/")[-1]).split(".")[:-1])
+        return PurePosixPath(path).stem
 
     @staticmethod
     def __get_rand_version() -> str:
         """
             Generate a random version string.
-            :return: 4 random bytes as a string
+            :return: a random 32-bit integer as a string
         """
-        return str(int.from_bytes(os.urandom(4), "big"))
+        return str(_RNG.getrandbits(32))
+
+
+def _load_parse_cache() -> dict:
+    """
+    Load the sidecar cache mapping file path -> {mtime_ns, size, content}.
+    A missing or unreadable cache just means every file gets parsed.
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
 
 
 def main():
@@ -344,35 +374,64 @@ def main():
 
     This function iterates over files in the specified working directory,
     identifies supported file types (.jar and .zip), and uses the Parser
-    class to extract relevant information. The extracted content is added
-    to a SyncData object, which is then serialized to a JSON file.
+    class to extract relevant information. Files are parsed in parallel on
+    a thread pool since each archive is independent and the work is mostly
+    disk I/O. Archives whose size and mtime match the sidecar cache from a
+    previous run are reused without being reopened. The extracted content is
+    added to a SyncData object, which is then serialized to a JSON file.
     The file is named and placed according to variable "output_file".
 
     Exceptions during parsing are caught and printed to the console.
     """
     sync_data = SyncData(contents=[])
+    cache = _load_parse_cache()
+    new_cache = {}
+    jobs = {}
 
-    for working_directory in working_directories:
-        correction = working_directory_to_url_override[working_directory]
-
-        try:
-            files = os.listdir(working_directory)
-            for file in files:
-                if file.endswith(".jar") or file.endswith(".zip"):
-                    fixed_path = (working_directory + "/" if not working_directory.endswith("/") else working_directory)
-                    file_path = fixed_path + file
-                    parser = Parser(file_path, correction, accept_mfs)
-                    try:
-                        content = parser.parse()
-                        sync_data.add_content(content)
-                        print(content)
-                    except Exception as e:
-                        print(e)
-        except Exception as e:
-            print("Error parsing files in ", working_directory, " ignoring: ", e)
-
-    with open(output_file, "w") as f:
-        f.write(sync_data.to_json())
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for working_directory in working_directories:
+            correction = working_directory_to_url_override[working_directory]
+
+            try:
+                # scandir yields entries with cached file-type info, avoiding
+                # an extra stat per file
+                with os.scandir(working_directory) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.endswith((".jar", ".zip")):
+                            stat = entry.stat()
+                            cached = cache.get(entry.path)
+                            if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                                # Unchanged since the last run; reuse the cached entry
+                                content = Content.from_dict(cached["content"])
+                                sync_data.add_content(content)
+                                new_cache[entry.path] = cached
+                                print(content)
+                                continue
+                            parser = Parser(entry.path, correction, accept_mfs)
+                            jobs[executor.submit(parser.parse)] = (entry.path, stat)
+            except Exception as e:
+                print("Error parsing files in ", working_directory, " ignoring: ", e)
+
+        # Collect results on the main thread so SyncData needs no locking
+        for job in as_completed(jobs):
+            file_path, stat = jobs[job]
+            try:
+                content = job.result()
+                sync_data.add_content(content)
+                new_cache[file_path] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "content": content.to_dict()
+                }
+                print(content)
+            except Exception as e:
+                print(e)
+
+    with open(output_file, "wb") as f:
+        sync_data.dump(f)
+
+    with open(cache_file, "wb") as f:
+        f.write(_json_dumps(new_cache))
 
     print("Done")
 